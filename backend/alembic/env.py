@@ -17,7 +17,7 @@ from app.db.base import Base
 from app.core.config import Settings
 
 # Importa todos os modelos para que Base.metadata seja populado para autogenerate
-from app.models import user, repository, analysis
+from app.models import user, repository, analysis, issue
 
 # Carrega as configurações
 settings = Settings()
@@ -2,24 +2,24 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-import google.generativeai as genai
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_db
-from app.core.config import settings
+from app.core.tracing import span, traced
 from app.models.analysis import AnalysisReport
 from app.models.repository import Repository
 from app.schemas.analysis import AnalysisResponse, FixResponse
-from app.services.ai_analyzer import analyze_code
+from app.services.ai_analyzer import analyze_code, generate_fix
+from app.services.concurrency import ModelBackendSaturated
+from app.services.issue_catalog import record_issues
+from app.services.report_cache import CachedReport, report_cache
 
 router = APIRouter()
 
-genai.configure(api_key=settings.GOOGLE_API_KEY)
-
 
 class AnalyzeRequest(BaseModel):
     code: str
@@ -49,6 +49,7 @@ class ReportDetail(BaseModel):
 
 
 @router.post("/analyze", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
+@traced("analysis.analyze")
 async def analyze(
     request: AnalyzeRequest,
     db: AsyncSession = Depends(get_db),
@@ -58,9 +59,10 @@ async def analyze(
     print(f"[DEBUG] Tamanho do código recebido: {len(request.code)} caracteres")
     
     # Verificar se repositório existe
-    result = await db.execute(
-        select(Repository).where(Repository.id == request.repository_id)
-    )
+    with span("db.repository_lookup"):
+        result = await db.execute(
+            select(Repository).where(Repository.id == request.repository_id)
+        )
     if not result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,9 +84,25 @@ async def analyze(
     
     print(f"[DEBUG] Salvando code_content com {len(request.code)} caracteres")
     
-    db.add(report)
-    await db.commit()
-    await db.refresh(report)
+    with span("db.save_report"):
+        db.add(report)
+        await db.flush()
+
+        # Normaliza as issues no catálogo e atualiza os contadores na mesma transação;
+        # resultados de falha do modelo não são análises reais e ficam de fora
+        issues = analysis_result.get("issues", [])
+        if not analysis_result.get("error") and isinstance(issues, list):
+            categories = analysis_result.get("categories")
+            await record_issues(
+                db,
+                request.repository_id,
+                report.id,
+                issues,
+                categories if isinstance(categories, list) else None,
+            )
+
+        await db.commit()
+        await db.refresh(report)
     
     print(f"[DEBUG] Relatório salvo com ID: {report.id}")
     print(f"[DEBUG] code_content salvo: {report.code_content is not None}")
@@ -92,12 +110,37 @@ async def analyze(
     return report
 
 
+def _cached_response(entry: CachedReport, if_none_match: str | None) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    tags = {tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")}
+    if entry.etag in tags or "*" in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/report/{report_id}", response_model=ReportDetail)
 async def get_report(
     report_id: UUID,
+    if_none_match: str | None = Header(default=None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Retorna detalhes de um relatório específico."""
+    """
+    Retorna detalhes de um relatório específico.
+
+    Respostas vêm do cache de relatórios. Com REDIS_URL, renomear ou apagar o
+    repositório invalida o cache em todos os workers; sem Redis, os outros
+    workers podem devolver o nome antigo (ou um relatório de repositório
+    apagado) por até REPORT_CACHE_LOCAL_TTL_SECONDS.
+    """
+    # Relatórios são imutáveis: visualizações repetidas saem do cache sem tocar no banco
+    cached = await report_cache.get(report_id)
+    if cached is not None:
+        return _cached_response(cached, if_none_match)
+
+    # Geração lida antes do banco: se um rename invalidar o cache durante a
+    # leitura, o payload (possivelmente com o nome antigo) não é gravado
+    generation = await report_cache.generation()
+
     print(f"[DEBUG] Buscando relatório: {report_id}")
     
     result = await db.execute(
@@ -121,7 +164,7 @@ async def get_report(
     if report.full_report and isinstance(report.full_report, dict):
         issues = report.full_report.get("issues", [])
     
-    return ReportDetail(
+    detail = ReportDetail(
         id=report.id,
         repository_name=report.repository.name,
         score=report.debt_score,
@@ -130,9 +173,17 @@ async def get_report(
         code_content=report.code_content,
         created_at=report.created_at,
     )
+    entry = await report_cache.set(
+        report.id,
+        report.repository_id,
+        detail.model_dump_json().encode("utf-8"),
+        generation,
+    )
+    return _cached_response(entry, if_none_match)
 
 
 @router.post("/report/{report_id}/fix", response_model=FixResponse)
+@traced("analysis.fix")
 async def fix_code(
     report_id: UUID,
     db: AsyncSession = Depends(get_db),
@@ -141,9 +192,10 @@ async def fix_code(
     print(f"[DEBUG] Tentando corrigir relatório: {report_id}")
     
     # Buscar relatório
-    result = await db.execute(
-        select(AnalysisReport).where(AnalysisReport.id == report_id)
-    )
+    with span("db.report_lookup"):
+        result = await db.execute(
+            select(AnalysisReport).where(AnalysisReport.id == report_id)
+        )
     report = result.scalar_one_or_none()
     
     if not report:
@@ -171,39 +223,16 @@ async def fix_code(
     
     print(f"[DEBUG] Issues encontradas: {len(issues)}")
     
-    issues_text = "\n".join(f"- {issue}" for issue in issues) if issues else "Nenhum problema específico listado."
-    
     # Gerar correção com IA
     try:
         print(f"[DEBUG] Iniciando chamada ao Gemini...")
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-        
-        prompt = f"""Atue como um Engenheiro de Software Sênior. Você receberá um código com problemas e uma lista de falhas. Sua tarefa é reescrever o código corrigindo todos os problemas citados. Retorne APENAS o código corrigido, sem markdown (```), sem explicações extras.
-
-Código:
-{report.code_content}
-
-Problemas:
-{issues_text}"""
-        
-        response = model.generate_content(prompt)
-        fixed_code = response.text.strip()
-        
-        print(f"[DEBUG] Resposta do Gemini recebida: {len(fixed_code)} caracteres")
-        
-        # Remover markdown se presente
-        if fixed_code.startswith("```python"):
-            fixed_code = fixed_code[9:]
-        elif fixed_code.startswith("```"):
-            fixed_code = fixed_code[3:]
-        if fixed_code.endswith("```"):
-            fixed_code = fixed_code[:-3]
-        
-        fixed_code = fixed_code.strip()
-        print(f"[DEBUG] Código corrigido gerado com sucesso")
+        fixed_code = await generate_fix(report.code_content, issues)
+        print(f"[DEBUG] Código corrigido gerado com sucesso: {len(fixed_code)} caracteres")
         
         return FixResponse(fixed_code=fixed_code)
-        
+
+    except ModelBackendSaturated:
+        raise
     except Exception as e:
         print(f"[DEBUG] Erro Gemini: {e}")
         print(f"[DEBUG] Tipo do erro: {type(e).__name__}")
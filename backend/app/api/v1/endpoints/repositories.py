@@ -1,13 +1,25 @@
+import uuid
+from datetime import datetime
 from typing import List
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from sqlalchemy import delete, insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.models.analysis import AnalysisReport
 from app.models.repository import Repository
 from app.models.user import User
-from app.schemas.repository import RepositoryCreate, RepositoryResponse
+from app.schemas.issue import IssueStat
+from app.schemas.repository import (
+    RepositoryBulkResult,
+    RepositoryCreate,
+    RepositoryResponse,
+    RepositoryUpdate,
+)
+from app.services.issue_catalog import forget_repository_issues, top_issues
+from app.services.report_cache import report_cache
 
 router = APIRouter()
 
@@ -37,6 +49,89 @@ async def create_repository(
     return repository
 
 
+@router.post("/bulk", response_model=List[RepositoryBulkResult])
+async def create_repositories_bulk(
+    repos_in: List[RepositoryCreate] = Body(..., max_length=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cria vários repositórios de uma vez (onboarding de organizações).
+
+    Donos e repositórios existentes são verificados com consultas IN e a
+    inserção é um único INSERT multi-linha. Um repositório é identificado por
+    (owner_id, url): os que já existem ou se repetem no lote não são criados de
+    novo. O cadastro individual continua aceitando duplicatas, como antes.
+    """
+    owner_ids = {repo_in.owner_id for repo_in in repos_in}
+    result = await db.execute(select(User.id).where(User.id.in_(owner_ids)))
+    known_owners = set(result.scalars().all())
+
+    keys = {(repo_in.owner_id, repo_in.url) for repo_in in repos_in if repo_in.owner_id in known_owners}
+    existing: dict[tuple[UUID, str], Repository] = {}
+    if keys:
+        result = await db.execute(
+            select(Repository).where(tuple_(Repository.owner_id, Repository.url).in_(keys))
+        )
+        existing = {(repo.owner_id, repo.url): repo for repo in result.scalars().all()}
+
+    seen: set[tuple[UUID, str]] = set()
+    rows = []
+    for repo_in in repos_in:
+        key = (repo_in.owner_id, repo_in.url)
+        if repo_in.owner_id not in known_owners or key in existing or key in seen:
+            continue
+        seen.add(key)
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "name": repo_in.name,
+                "url": repo_in.url,
+                "owner_id": repo_in.owner_id,
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    created: dict[tuple[UUID, str], Repository] = {}
+    if rows:
+        stmt = (
+            insert(Repository)
+            .values(rows)
+            .returning(Repository)
+        )
+        result = await db.scalars(stmt)
+        created = {(repo.owner_id, repo.url): repo for repo in result.all()}
+        await db.commit()
+
+    results = []
+    reported: set[tuple[UUID, str]] = set()
+    for repo_in in repos_in:
+        key = (repo_in.owner_id, repo_in.url)
+        item = {"name": repo_in.name, "url": repo_in.url, "owner_id": repo_in.owner_id}
+        if repo_in.owner_id not in known_owners:
+            results.append(RepositoryBulkResult(**item, status="owner_not_found"))
+        elif key in reported:
+            results.append(RepositoryBulkResult(**item, status="duplicate"))
+        elif key in created:
+            results.append(
+                RepositoryBulkResult(
+                    **item,
+                    status="created",
+                    repository=RepositoryResponse.model_validate(created[key]),
+                )
+            )
+        else:
+            repo = existing.get(key)
+            results.append(
+                RepositoryBulkResult(
+                    **item,
+                    status="exists",
+                    repository=RepositoryResponse.model_validate(repo) if repo else None,
+                )
+            )
+        reported.add(key)
+    return results
+
+
 @router.get("/", response_model=List[RepositoryResponse])
 async def list_repositories(
     skip: int = 0,
@@ -46,3 +141,86 @@ async def list_repositories(
     """Lista todos os repositórios."""
     result = await db.execute(select(Repository).offset(skip).limit(limit))
     return result.scalars().all()
+
+
+@router.patch("/{repository_id}", response_model=RepositoryResponse)
+async def update_repository(
+    repository_id: UUID,
+    repo_in: RepositoryUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Atualiza (renomeia) um repositório."""
+    result = await db.execute(select(Repository).where(Repository.id == repository_id))
+    repository = result.scalar_one_or_none()
+    if not repository:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repositório não encontrado",
+        )
+
+    for field, value in repo_in.model_dump(exclude_unset=True, exclude_none=True).items():
+        setattr(repository, field, value)
+    await db.commit()
+
+    # O nome do repositório faz parte dos relatórios em cache
+    await report_cache.invalidate_repository(repository_id)
+    await db.refresh(repository)
+    return repository
+
+
+@router.delete("/{repository_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_repository(
+    repository_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove um repositório e todas as suas análises."""
+    result = await db.execute(select(Repository.id).where(Repository.id == repository_id))
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repositório não encontrado",
+        )
+
+    # Remoção em massa, sem carregar os relatórios (e seu code_content) na memória.
+    # report_issue é apagado em cascata pela FK de analysis_report.
+    await forget_repository_issues(db, repository_id)
+    await db.execute(
+        delete(AnalysisReport)
+        .where(AnalysisReport.repository_id == repository_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(Repository)
+        .where(Repository.id == repository_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await report_cache.invalidate_repository(repository_id)
+
+
+@router.get("/{repository_id}/issues/top", response_model=List[IssueStat])
+async def list_top_issues(
+    repository_id: UUID,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+):
+    """Lista as issues mais frequentes de um repositório."""
+    result = await db.execute(select(Repository.id).where(Repository.id == repository_id))
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repositório não encontrado",
+        )
+
+    rows = await top_issues(db, repository_id, limit=limit)
+    return [
+        IssueStat(
+            id=issue.id,
+            text=issue.text,
+            category=issue.category,
+            occurrence_count=counter.occurrence_count,
+            total_occurrences=issue.occurrence_count,
+            last_seen_at=counter.last_seen_at,
+        )
+        for issue, counter in rows
+    ]
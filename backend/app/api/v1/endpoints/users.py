@@ -1,12 +1,15 @@
+import uuid
+from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse
+from app.schemas.user import UserBulkResult, UserCreate, UserResponse
 
 router = APIRouter()
 
@@ -37,6 +40,78 @@ async def create_user(
     return user
 
 
+@router.post("/bulk", response_model=List[UserBulkResult])
+async def create_users_bulk(
+    users_in: List[UserCreate] = Body(..., max_length=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cria vários usuários de uma vez (onboarding de organizações).
+
+    Usa uma única consulta IN para os emails existentes, um único INSERT
+    multi-linha com ON CONFLICT DO NOTHING e um único commit.
+    """
+    emails = {user_in.email for user_in in users_in}
+    result = await db.execute(select(User).where(User.email.in_(emails)))
+    existing = {user.email: user for user in result.scalars().all()}
+
+    seen: set[str] = set()
+    rows = []
+    for user_in in users_in:
+        if user_in.email in existing or user_in.email in seen:
+            continue
+        seen.add(user_in.email)
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "email": user_in.email,
+                "hashed_password": user_in.password,  # TODO: Implementar hash
+                "full_name": user_in.full_name,
+                "is_active": True,
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    created: dict[str, User] = {}
+    if rows:
+        stmt = (
+            pg_insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        )
+        result = await db.scalars(stmt)
+        created = {user.email: user for user in result.all()}
+        await db.commit()
+
+    results = []
+    reported: set[str] = set()
+    for user_in in users_in:
+        email = user_in.email
+        if email in reported:
+            results.append(UserBulkResult(email=email, status="duplicate"))
+        elif email in created:
+            results.append(
+                UserBulkResult(
+                    email=email,
+                    status="created",
+                    user=UserResponse.model_validate(created[email]),
+                )
+            )
+        else:
+            # Já existia antes da requisição ou foi criado concorrentemente
+            user = existing.get(email)
+            results.append(
+                UserBulkResult(
+                    email=email,
+                    status="exists",
+                    user=UserResponse.model_validate(user) if user else None,
+                )
+            )
+        reported.add(email)
+    return results
+
+
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
     skip: int = 0,
@@ -17,6 +17,33 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     SECRET_KEY: str
     GOOGLE_API_KEY: str
+
+    # Modelo e orçamento de tokens dos prompts enviados ao Gemini
+    GEMINI_MODEL: str = "gemini-2.5-flash-lite"
+    PROMPT_TOKEN_BUDGET: int = 6000
+    PROMPT_MAX_STRING_CHARS: int = 200
+
+    # Servidor de produção (python -m app.server)
+    WEB_CONCURRENCY: Optional[int] = None  # padrão: número de núcleos
+    KEEP_ALIVE_TIMEOUT: int = 5
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    # Limite global de chamadas simultâneas ao modelo por processo
+    MAX_INFLIGHT_MODEL_CALLS: int = 8
+    MAX_QUEUED_MODEL_CALLS: int = 32
+    MODEL_QUEUE_TIMEOUT_SECONDS: float = 15.0
+
+    # Cache de leitura dos relatórios (LRU local + Redis opcional)
+    REDIS_URL: Optional[str] = None
+    REPORT_CACHE_SIZE: int = 1024
+    REPORT_CACHE_LOCAL_TTL_SECONDS: float = 5.0  # defasagem máxima entre workers sem Redis
+    REPORT_CACHE_REDIS_TTL_SECONDS: int = 86400
+
+    # Tracing (none, file ou otel) e gravação opcional das chamadas ao modelo
+    TRACING_EXPORTER: str = "none"
+    TRACE_DIR: str = "traces"
+    MODEL_RECORDING_DIR: Optional[str] = None  # contém código dos usuários: só ative de propósito
+    # Caminho de gravações para responder com o modelo falso em vez do Gemini
+    FAKE_MODEL_RECORDINGS: Optional[str] = None
     
     # Propriedade para montar a URI de conexão assíncrona
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
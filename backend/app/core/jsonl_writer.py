@@ -0,0 +1,60 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any
+
+
+class JsonLinesWriter:
+    """
+    Grava registros em JSON Lines, um arquivo por processo e por dia.
+
+    write() só enfileira o registro; a serialização e a escrita acontecem em
+    lotes numa thread em segundo plano, fora do event loop.
+    """
+
+    _STOP = object()
+
+    def __init__(self, directory: str, prefix: str, max_batch: int = 512):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_batch = max_batch
+        os.makedirs(directory, exist_ok=True)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"{prefix}-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._queue.put(record)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Grava os registros pendentes e encerra a thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is self._STOP for item in batch)
+            records = [item for item in batch if item is not self._STOP]
+            if records:
+                self._write(records)
+            if stop:
+                return
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        filename = f"{self.prefix}-{datetime.utcnow():%Y%m%d}-{os.getpid()}.jsonl"
+        try:
+            with open(os.path.join(self.directory, filename), "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        except OSError as e:
+            print(f"[DEBUG] Falha ao gravar {len(records)} registros em {self.directory}: {e}")
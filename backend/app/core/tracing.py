@@ -0,0 +1,193 @@
+"""
+Spans de tracing leves e compatíveis com OpenTelemetry.
+
+Uso:
+
+    with span("ai.model_call", kind="analyze") as s:
+        ...
+        s.set_attribute("tokens", 123)
+
+Os exportadores são plugáveis (add_exporter). Com TRACING_EXPORTER=file cada
+span é gravado como uma linha JSON no formato do OTLP/JSON em TRACE_DIR; com
+TRACING_EXPORTER=otel os spans também são criados no tracer do OpenTelemetry
+(o SDK e seus exportadores são configurados pelas variáveis OTEL_*).
+"""
+import functools
+import secrets
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Protocol, TypeVar
+
+from app.core.config import settings
+from app.core.jsonl_writer import JsonLinesWriter
+
+T = TypeVar("T")
+
+
+class Span:
+    def __init__(self, name: str, parent: "Span | None", attributes: dict[str, Any], otel_span=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.status = "OK"
+        self.events: list[dict[str, Any]] = []
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self._otel_span = otel_span
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel_span is not None:
+            self._otel_span.set_attribute(key, value)
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.events.append(
+            {
+                "name": "exception",
+                "timeUnixNano": time.time_ns(),
+                "attributes": {
+                    "exception.type": type(exc).__name__,
+                    "exception.message": str(exc),
+                },
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+            "events": self.events,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class FileSpanExporter:
+    """
+    Grava os spans em JSON Lines, um arquivo por processo e por dia.
+
+    A escrita é feita em lotes por uma thread em segundo plano (JsonLinesWriter),
+    para o tracing não somar I/O de disco à latência que está medindo.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._writer = JsonLinesWriter(directory, "traces")
+
+    def export(self, span: Span) -> None:
+        self._writer.write(span.to_dict())
+
+    def shutdown(self) -> None:
+        """Grava os spans pendentes."""
+        self._writer.shutdown()
+
+
+class InMemorySpanExporter:
+    """Mantém os spans em memória (usado pelos benchmarks)."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_exporters: list[SpanExporter] = []
+_otel_tracer = None
+
+
+def add_exporter(exporter: SpanExporter) -> None:
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: SpanExporter) -> None:
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def configure_tracing() -> None:
+    """Configura os exportadores a partir de TRACING_EXPORTER (none, file ou otel)."""
+    global _otel_tracer
+    exporter = settings.TRACING_EXPORTER.lower()
+    if exporter == "file":
+        add_exporter(FileSpanExporter(settings.TRACE_DIR))
+    elif exporter == "otel":
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            print("[DEBUG] TRACING_EXPORTER=otel, mas opentelemetry-api não está instalado")
+            return
+        _otel_tracer = trace.get_tracer("humanflow")
+
+
+def shutdown_tracing() -> None:
+    """Descarrega os exportadores que gravam em segundo plano."""
+    for exporter in _exporters:
+        shutdown = getattr(exporter, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    otel_cm = (
+        _otel_tracer.start_as_current_span(name, attributes=attributes)
+        if _otel_tracer is not None
+        else nullcontext()
+    )
+    with otel_cm as otel_span:
+        current = Span(name, _current_span.get(), attributes, otel_span)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.record_exception(e)
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current_span.reset(token)
+            for exporter in _exporters:
+                try:
+                    exporter.export(current)
+                except Exception as e:
+                    print(f"[DEBUG] Falha ao exportar span {name}: {e}")
+
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorator que envolve uma função assíncrona (ex.: um endpoint) em um span raiz."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
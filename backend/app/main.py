@@ -1,7 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.tracing import configure_tracing, shutdown_tracing
+from app.services.concurrency import ModelBackendSaturated
+from app.services.model_recorder import model_recorder
+from app.services.report_cache import report_cache
 
 app = FastAPI(title="HumanFlow AI", openapi_url=f"{settings.API_V1_STR}/openapi.json")
 
@@ -18,13 +23,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 # --------------------------------------------
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+
+@app.exception_handler(ModelBackendSaturated)
+async def model_backend_saturated_handler(request: Request, exc: ModelBackendSaturated):
+    # Backend do modelo saturado: descarta a requisição em vez de enfileirar indefinidamente
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     print("Iniciando a aplicação...")
+    configure_tracing()
+    await report_cache.start()
     # Aqui poderíamos testar a conexão com o banco
-    print("✅ Conexão com Banco de Dados estabelecida!")
\ No newline at end of file
+    print("✅ Conexão com Banco de Dados estabelecida!")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await report_cache.stop()
+    # Grava os spans e as chamadas ao modelo ainda na fila de escrita
+    shutdown_tracing()
+    if model_recorder is not None:
+        model_recorder.shutdown()
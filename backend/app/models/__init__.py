@@ -1,5 +1,6 @@
 from .analysis import AnalysisReport
+from .issue import Issue, ReportIssue, RepositoryIssue
 from .repository import Repository
 from .user import User
 
-__all__ = ["User", "Repository", "AnalysisReport"]
\ No newline at end of file
+__all__ = ["User", "Repository", "AnalysisReport", "Issue", "ReportIssue", "RepositoryIssue"]
\ No newline at end of file
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Issue(Base):
+    """Catálogo de issues normalizadas, deduplicadas pelo hash do texto."""
+
+    __tablename__ = "issue"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    category: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
+
+
+class ReportIssue(Base):
+    """Ligação compacta entre um relatório e as issues do catálogo."""
+
+    __tablename__ = "report_issue"
+
+    report_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("analysis_report.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    issue_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("issue.id", ondelete="CASCADE"), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RepositoryIssue(Base):
+    """Contador de ocorrências de cada issue por repositório, mantido na escrita."""
+
+    __tablename__ = "repository_issue"
+    __table_args__ = (
+        Index(
+            "ix_repository_issue_top",
+            "repository_id",
+            "occurrence_count",
+        ),
+    )
+
+    repository_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("repository.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    issue_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("issue.id", ondelete="CASCADE"), primary_key=True
+    )
+    occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
@@ -1,14 +1,19 @@
-from .user import UserBase, UserCreate, UserUpdate, UserResponse
-from .repository import RepositoryBase, RepositoryCreate, RepositoryResponse
+from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserBulkResult
+from .repository import RepositoryBase, RepositoryCreate, RepositoryUpdate, RepositoryResponse, RepositoryBulkResult
 from .analysis import AnalysisResponse
+from .issue import IssueStat
 
 __all__ = [
     "UserBase",
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserBulkResult",
     "RepositoryBase",
     "RepositoryCreate",
+    "RepositoryUpdate",
     "RepositoryResponse",
+    "RepositoryBulkResult",
     "AnalysisResponse",
+    "IssueStat",
 ]
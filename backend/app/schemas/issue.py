@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class IssueStat(BaseModel):
+    id: int
+    text: str
+    category: str
+    occurrence_count: int
+    total_occurrences: int
+    last_seen_at: datetime
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -15,9 +15,22 @@ class RepositoryCreate(RepositoryBase):
     owner_id: UUID  # Temporário até implementar Auth JWT
 
 
+class RepositoryUpdate(BaseModel):
+    name: Optional[str] = None
+    url: Optional[str] = None
+
+
 class RepositoryResponse(RepositoryBase):
     id: UUID
     owner_id: UUID
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class RepositoryBulkResult(BaseModel):
+    name: str
+    url: str
+    owner_id: UUID
+    status: Literal["created", "exists", "duplicate", "owner_not_found"]
+    repository: Optional[RepositoryResponse] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr
@@ -27,3 +27,9 @@ class UserResponse(UserBase):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class UserBulkResult(BaseModel):
+    email: EmailStr
+    status: Literal["created", "exists", "duplicate"]
+    user: Optional[UserResponse] = None
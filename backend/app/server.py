@@ -0,0 +1,40 @@
+"""
+Ponto de entrada de produção: `python -m app.server`.
+
+Roda vários workers uvicorn (um por núcleo, por padrão) com uvloop e httptools,
+keep-alive ajustado e desligamento gracioso para que as análises em andamento
+terminem antes de o processo sair.
+"""
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+    # Respeita o limite de CPUs do container quando disponível
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return max(os.cpu_count() or 1, 1)
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=worker_count(),
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,21 @@
 import json
+import time
+from typing import Any, Callable
+
 import google.generativeai as genai
+
 from app.core.config import settings
+from app.core.tracing import span
+from app.services.concurrency import ModelBackendSaturated, model_call_limiter
+from app.services.fake_model import FakeGenerativeModel
+from app.services.model_recorder import load_recordings, model_recorder
+from app.services.prompt_builder import (
+    CompactedCode,
+    compact_code,
+    estimate_tokens,
+    format_issue_list,
+    log_usage,
+)
 
 # Configura a API Key
 genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -29,32 +44,142 @@ FORMATO DE RESPOSTA:
 "summary": "<Resumo executivo de 1 frase em Português do Brasil>",
 "issues": [
 "<Lista de strings curtas e diretas com os problemas encontrados>"
+],
+"categories": [
+"<Categoria de cada issue, na mesma ordem da lista acima: security, bug, performance ou smell>"
 ]
 }
 """
 
+FIX_INSTRUCTION = """Atue como um Engenheiro de Software Sênior. Você receberá um código com problemas e uma lista de falhas. Sua tarefa é reescrever o código corrigindo todos os problemas citados. Retorne APENAS o código corrigido, sem markdown (```), sem explicações extras."""
+
+# Modelos já configurados por instrução de sistema
+_models: dict[str, genai.GenerativeModel] = {}
+
+
+def _get_model(instruction: str) -> genai.GenerativeModel:
+    """
+    Retorna um modelo com a instrução estática como system_instruction.
+
+    As instruções têm poucas centenas de tokens, abaixo do mínimo que o Gemini
+    aceita para context caching, então são enviadas como system_instruction.
+    """
+    model = _models.get(instruction)
+    if model is not None:
+        return model
+
+    if settings.FAKE_MODEL_RECORDINGS:
+        # Replay offline: responde a partir das gravações, sem chamar o Gemini
+        model = FakeGenerativeModel(instruction, load_recordings(settings.FAKE_MODEL_RECORDINGS))
+    else:
+        model = genai.GenerativeModel(settings.GEMINI_MODEL, system_instruction=instruction)
+    _models[instruction] = model
+    return model
+
+
+async def _call_model(
+    kind: str,
+    instruction: str,
+    prompt: str,
+    compacted: CompactedCode | None,
+    inputs: dict,
+    parse: Callable[[str], Any],
+):
+    """
+    Chama o modelo respeitando o limitador e interpreta a resposta com parse,
+    com spans, log de uso e gravação opcional (o resultado interpretado, ou
+    None se parse falhar, vai junto para o replay comparar).
+    """
+    model = _get_model(instruction)
+    async with model_call_limiter.slot():
+        with span("ai.model_call", kind=kind, model=settings.GEMINI_MODEL) as s:
+            started = time.perf_counter()
+            response = await model.generate_content_async(prompt)
+            latency_ms = (time.perf_counter() - started) * 1000
+            usage = getattr(response, "usage_metadata", None)
+            s.set_attribute("prompt_tokens", getattr(usage, "prompt_token_count", None))
+            s.set_attribute("cached_tokens", getattr(usage, "cached_content_token_count", None))
+            s.set_attribute("output_tokens", getattr(usage, "candidates_token_count", None))
+
+    log_usage(kind, response, compacted)
+    result = None
+    try:
+        with span("ai.parse_response", kind=kind):
+            result = parse(response.text)
+        return result
+    finally:
+        if model_recorder is not None:
+            model_recorder.record(kind, instruction, inputs, prompt, response, latency_ms, result)
+
+
+def _strip_markdown(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```json"): text = text[7:]
+    elif text.startswith("```python"): text = text[9:]
+    elif text.startswith("```"): text = text[3:]
+    if text.endswith("```"): text = text[:-3]
+    return text.strip()
+
+
 async def analyze_code(code_snippet: str) -> dict:
     try:
-        MODEL_NAME = "gemini-2.5-flash-lite"
-        
-        model = genai.GenerativeModel(MODEL_NAME)
-        
-        prompt = f"{SYSTEM_INSTRUCTION}\n\nCÓDIGO:\n{code_snippet}"
-        
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-        
+        with span("ai.prompt_build", kind="analyze", code_chars=len(code_snippet)) as s:
+            compacted = compact_code(code_snippet)
+            if compacted.numbered:
+                prompt = (
+                    "CÓDIGO (trechos removidos para caber no limite; cada linha começa com o "
+                    "seu número no arquivo original, use esses números ao citar linhas):\n"
+                    f"{compacted.text}"
+                )
+            else:
+                prompt = f"CÓDIGO:\n{compacted.text}"
+            s.set_attribute("code_tokens_estimate", compacted.tokens)
+            s.set_attribute("stages", ",".join(compacted.stages))
+
         # Limpeza agressiva para garantir JSON válido
-        if text.startswith("```json"): text = text[7:]
-        if text.startswith("```"): text = text[3:]
-        if text.endswith("```"): text = text[:-3]
-        
-        return json.loads(text.strip())
-        
+        return await _call_model(
+            "analyze",
+            SYSTEM_INSTRUCTION,
+            prompt,
+            compacted,
+            {"code": code_snippet},
+            lambda text: json.loads(_strip_markdown(text)),
+        )
+
+    except ModelBackendSaturated:
+        raise
     except Exception as e:
         print(f"Erro Real da IA: {e}")
+        # "error" marca o resultado como falha do modelo: não é uma análise real
+        # e suas issues não devem entrar no catálogo
         return {
             "score": 0,
             "summary": f"Erro de Modelo: {str(e)}",
-            "issues": ["Verifique o nome do modelo no arquivo ai_analyzer.py"]
-        }
\ No newline at end of file
+            "issues": [],
+            "error": True,
+        }
+
+
+async def generate_fix(code: str, issues: list[str]) -> str:
+    """Gera o código corrigido para as issues informadas. Erros do modelo são propagados."""
+    # O modelo reescreve o código e a resposta vai direto para o usuário: o código
+    # original é enviado sem compactação, senão comentários, strings e o final do
+    # arquivo voltariam mutilados no "código corrigido".
+    with span("ai.prompt_build", kind="fix", code_chars=len(code)) as s:
+        issues_text = format_issue_list(issues)
+        prompt = f"""Código:
+{code}
+
+Problemas:
+{issues_text}"""
+        code_tokens = estimate_tokens(code)
+        s.set_attribute("code_tokens_estimate", code_tokens)
+        if code_tokens > settings.PROMPT_TOKEN_BUDGET:
+            print(
+                f"[DEBUG] Código para correção acima do orçamento "
+                f"({code_tokens} > {settings.PROMPT_TOKEN_BUDGET} tokens estimados); enviado sem compactação"
+            )
+
+    return await _call_model(
+        "fix", FIX_INSTRUCTION, prompt, None, {"code": code, "issues": issues}, _strip_markdown
+    )
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.tracing import span
+
+
+class ModelBackendSaturated(Exception):
+    """O limite de chamadas ao modelo foi atingido e a requisição foi descartada."""
+
+    def __init__(self, reason: str, retry_after: int = 5):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ModelCallLimiter:
+    """
+    Limita as chamadas simultâneas ao modelo dentro de um processo.
+
+    Até `max_inflight` chamadas rodam em paralelo; até `max_queued` esperam por
+    uma vaga por no máximo `queue_timeout` segundos. Acima disso a chamada é
+    descartada com ModelBackendSaturated (HTTP 503).
+
+    O desligamento gracioso não passa por aqui: o uvicorn para de aceitar
+    conexões e espera as requisições em andamento (GRACEFUL_SHUTDOWN_TIMEOUT,
+    ver app/server.py) antes de encerrar o worker.
+    """
+
+    def __init__(self, max_inflight: int, max_queued: int, queue_timeout: float):
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore: asyncio.Semaphore | None = None
+        self.inflight = 0
+        self.queued = 0
+
+    def _ensure_primitives(self) -> None:
+        # Criados sob demanda para ficarem ligados ao event loop do worker
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self._ensure_primitives()
+        if self._semaphore.locked() and self.queued >= self.max_queued:
+            raise ModelBackendSaturated("Fila de análises cheia, tente novamente em instantes")
+
+        if self._semaphore.locked():
+            self.queued += 1
+            try:
+                with span("ai.queue_wait", inflight=self.inflight, queued=self.queued):
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise ModelBackendSaturated("Tempo de espera por uma vaga no modelo esgotado")
+            finally:
+                self.queued -= 1
+        else:
+            # Há vaga livre: acquire retorna sem suspender
+            await self._semaphore.acquire()
+
+        self.inflight += 1
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            self._semaphore.release()
+
+
+model_call_limiter = ModelCallLimiter(
+    max_inflight=settings.MAX_INFLIGHT_MODEL_CALLS,
+    max_queued=settings.MAX_QUEUED_MODEL_CALLS,
+    queue_timeout=settings.MODEL_QUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from app.services.model_recorder import prompt_key
+
+
+class FakeModelMiss(LookupError):
+    """O prompt não existe nas gravações (o prompt gerado mudou desde a gravação)."""
+
+
+class FakeGenerativeModel:
+    """
+    Substituto do GenerativeModel que responde a partir de gravações.
+
+    Permite reproduzir tráfego real offline: o mesmo prompt devolve a mesma
+    resposta e o mesmo usage_metadata. Com simulate_latency, a latência de
+    rede gravada também é reproduzida.
+    """
+
+    def __init__(self, instruction: str, recordings: list[dict[str, Any]], simulate_latency: bool = False):
+        self.instruction = instruction
+        self.simulate_latency = simulate_latency
+        self._responses = {recording["key"]: recording for recording in recordings}
+
+    async def generate_content_async(self, prompt: str):
+        recording = self._responses.get(prompt_key(self.instruction, prompt))
+        if recording is None:
+            raise FakeModelMiss("Prompt não encontrado nas gravações")
+        if self.simulate_latency:
+            await asyncio.sleep(recording.get("latency_ms", 0) / 1000)
+        return SimpleNamespace(
+            text=recording["response_text"],
+            usage_metadata=SimpleNamespace(**recording.get("usage", {})),
+        )
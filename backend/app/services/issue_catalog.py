@@ -0,0 +1,212 @@
+import hashlib
+import re
+import unicodedata
+from datetime import datetime
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.issue import Issue, ReportIssue, RepositoryIssue
+
+# Categorias alinhadas com os quatro itens do SYSTEM_INSTRUCTION
+CATEGORY_SECURITY = "security"
+CATEGORY_BUG = "bug"
+CATEGORY_PERFORMANCE = "performance"
+CATEGORY_SMELL = "smell"
+
+CATEGORIES = (CATEGORY_SECURITY, CATEGORY_BUG, CATEGORY_PERFORMANCE, CATEGORY_SMELL)
+
+# Fallback quando o modelo não informa a categoria: palavras-chave (sem acento,
+# minúsculas) casadas por palavra inteira. A ordem importa: segurança tem
+# prioridade sobre bug, que tem prioridade sobre performance.
+_CATEGORY_KEYWORDS = [
+    (CATEGORY_SECURITY, (
+        r"seguranca", r"security", r"vulnerab\w*", r"injec\w*", r"xss", r"csrf", r"owasp",
+        r"senhas?", r"passwords?", r"secrets?", r"segredos?", r"hardcoded", r"credenc\w*",
+        r"credentials?", r"api[ _-]?keys?", r"eval", r"exec",
+    )),
+    (CATEGORY_BUG, (
+        r"bugs?", r"erros? de sintaxe", r"syntax", r"sintaxe", r"exceptions?", r"excecao",
+        r"excecoes", r"nao tratad[ao]s?", r"crash\w*", r"incorret[ao]s?", r"undefined",
+        r"indefinid[ao]s?", r"logic[ao]s?", r"logic",
+    )),
+    (CATEGORY_PERFORMANCE, (
+        r"performance", r"desempenho", r"lent[ao]s?", r"lentidao", r"loops? infinitos?",
+        r"infinite loops?", r"complexidade", r"complexity", r"o\(n", r"memoria", r"memory",
+        r"ineficien\w*", r"inefficien\w*", r"n\+1",
+    )),
+]
+_CATEGORY_PATTERNS = [
+    (category, re.compile(r"\b(?:" + "|".join(keywords) + r")\b"))
+    for category, keywords in _CATEGORY_KEYWORDS
+]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Referências a linhas ("na linha 12", "nas linhas 6, 7 e 8", "(line 3-5)", "L6:"):
+# mudam a cada análise e impediriam a deduplicação da mesma issue
+_LINE_NUMBERS = r"\d+(?:\s*(?:-|–|,|a|to|e|and)\s*\d+)*"
+_LINE_REF_RE = re.compile(
+    r"\(\s*(?:linhas?|lines?|l\.?)\s*" + _LINE_NUMBERS + r"\s*\)"
+    r"|\b(?:(?:n[ao]s?|em|on|at|in)\s+)?(?:linhas?|lines?)\s+" + _LINE_NUMBERS
+    + r"|^l\d+(?:\s*-\s*l?\d+)?\s*:",
+    re.IGNORECASE,
+)
+_SPACE_BEFORE_PUNCTUATION_RE = re.compile(r"\s+([,.;:!?])")
+
+
+def normalize_issue(text: str) -> str:
+    """
+    Normaliza o texto de uma issue para o catálogo: sem referências a linhas,
+    espaços repetidos e pontuação nas pontas. O texto completo continua no
+    full_report do relatório.
+    """
+    text = _LINE_REF_RE.sub(" ", text)
+    text = _SPACE_BEFORE_PUNCTUATION_RE.sub(r"\1", _WHITESPACE_RE.sub(" ", text))
+    return text.strip().lstrip(":-–, ").rstrip(".;:,-– ")
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def issue_hash(text: str) -> str:
+    """Hash estável usado para deduplicar issues no catálogo."""
+    return hashlib.sha256(_fold(normalize_issue(text)).encode("utf-8")).hexdigest()
+
+
+def classify_issue(text: str, category: str | None = None) -> str:
+    """
+    Classifica uma issue em security/bug/performance/smell.
+
+    Usa a categoria informada pelo modelo quando válida; caso contrário, cai
+    para a busca por palavras-chave.
+    """
+    if isinstance(category, str) and category.strip().lower() in CATEGORIES:
+        return category.strip().lower()
+    folded = _fold(text)
+    for category_name, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(folded):
+            return category_name
+    return CATEGORY_SMELL
+
+
+async def record_issues(
+    db: AsyncSession,
+    repository_id: UUID,
+    report_id: UUID,
+    issues: Iterable[str],
+    categories: Sequence[str | None] | None = None,
+    seen_at: datetime | None = None,
+) -> None:
+    """
+    Registra as issues de um relatório no catálogo e atualiza os contadores.
+
+    seen_at é o momento da análise (padrão: agora); o backfill passa a data do
+    relatório. Não faz commit: deve ser chamada dentro da mesma transação que
+    insere o relatório.
+    """
+    categories = list(categories or [])
+    entries: dict[str, tuple[str, str]] = {}
+    for index, raw in enumerate(issues):
+        if not isinstance(raw, str):
+            continue
+        text = normalize_issue(raw)
+        if text:
+            category = categories[index] if index < len(categories) else None
+            entries.setdefault(issue_hash(text), (text, classify_issue(text, category)))
+
+    if not entries:
+        return
+
+    # Upsert no catálogo: uma única instrução para todas as issues do relatório.
+    # As linhas são escritas em ordem de hash (e os contadores em ordem de id) para
+    # que análises concorrentes travem as mesmas linhas na mesma ordem, sem deadlock.
+    catalog_stmt = pg_insert(Issue).values(
+        [
+            {"hash": digest, "text": text, "category": category, "occurrence_count": 1}
+            for digest, (text, category) in sorted(entries.items())
+        ]
+    )
+    catalog_stmt = catalog_stmt.on_conflict_do_update(
+        index_elements=[Issue.hash],
+        set_={"occurrence_count": Issue.occurrence_count + 1},
+    ).returning(Issue.id, Issue.hash)
+    result = await db.execute(catalog_stmt)
+    issue_ids = {digest: issue_id for issue_id, digest in result.all()}
+
+    ordered_ids = [issue_ids[digest] for digest in entries if digest in issue_ids]
+
+    await db.execute(
+        pg_insert(ReportIssue)
+        .values(
+            [
+                {"report_id": report_id, "issue_id": issue_id, "position": position}
+                for position, issue_id in enumerate(ordered_ids)
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+
+    seen_at = seen_at or datetime.utcnow()
+    counter_stmt = pg_insert(RepositoryIssue).values(
+        [
+            {
+                "repository_id": repository_id,
+                "issue_id": issue_id,
+                "occurrence_count": 1,
+                "last_seen_at": seen_at,
+            }
+            for issue_id in sorted(ordered_ids)
+        ]
+    )
+    counter_stmt = counter_stmt.on_conflict_do_update(
+        index_elements=[RepositoryIssue.repository_id, RepositoryIssue.issue_id],
+        set_={
+            "occurrence_count": RepositoryIssue.occurrence_count + 1,
+            "last_seen_at": func.greatest(RepositoryIssue.last_seen_at, counter_stmt.excluded.last_seen_at),
+        },
+    )
+    await db.execute(counter_stmt)
+
+
+async def forget_repository_issues(db: AsyncSession, repository_id: UUID) -> None:
+    """
+    Desconta as ocorrências de um repositório do catálogo e remove seus contadores.
+
+    Issue.occurrence_count é a soma dos contadores por repositório, então basta
+    subtrair os do repositório removido. Não faz commit: deve rodar na mesma
+    transação que apaga o repositório.
+    """
+    await db.execute(
+        update(Issue)
+        .where(Issue.id == RepositoryIssue.issue_id)
+        .where(RepositoryIssue.repository_id == repository_id)
+        .values(occurrence_count=Issue.occurrence_count - RepositoryIssue.occurrence_count)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(RepositoryIssue)
+        .where(RepositoryIssue.repository_id == repository_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def top_issues(
+    db: AsyncSession,
+    repository_id: UUID,
+    limit: int = 10,
+) -> list[tuple[Issue, RepositoryIssue]]:
+    """Retorna as issues mais frequentes de um repositório usando o índice de contadores."""
+    result = await db.execute(
+        select(Issue, RepositoryIssue)
+        .join(RepositoryIssue, RepositoryIssue.issue_id == Issue.id)
+        .where(RepositoryIssue.repository_id == repository_id)
+        .order_by(RepositoryIssue.occurrence_count.desc(), Issue.id)
+        .limit(limit)
+    )
+    return [(row[0], row[1]) for row in result.all()]
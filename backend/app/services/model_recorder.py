@@ -0,0 +1,81 @@
+import copy
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+from app.core.jsonl_writer import JsonLinesWriter
+
+
+def prompt_key(instruction: str, prompt: str) -> str:
+    """Chave estável de uma chamada ao modelo (instrução de sistema + prompt)."""
+    return hashlib.sha256(f"{instruction}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def _usage_to_dict(response) -> dict[str, Any]:
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_token_count": getattr(usage, "prompt_token_count", None),
+        "candidates_token_count": getattr(usage, "candidates_token_count", None),
+        "cached_content_token_count": getattr(usage, "cached_content_token_count", None),
+    }
+
+
+class ModelRecorder:
+    """
+    Grava prompts e respostas do modelo em JSON Lines para replay offline.
+
+    As gravações incluem o código enviado pelos usuários, por isso só são
+    feitas quando MODEL_RECORDING_DIR está definido. A escrita é feita em lotes
+    por uma thread em segundo plano, fora do event loop.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._writer = JsonLinesWriter(directory, "model-calls")
+
+    def record(
+        self,
+        kind: str,
+        instruction: str,
+        inputs: dict[str, Any],
+        prompt: str,
+        response,
+        latency_ms: float,
+        result: Any = None,
+    ) -> None:
+        entry = {
+            "kind": kind,
+            "key": prompt_key(instruction, prompt),
+            "model": settings.GEMINI_MODEL,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "inputs": inputs,
+            "prompt": prompt,
+            "response_text": response.text,
+            # Resultado devolvido pelo pipeline (None se a resposta não pôde ser interpretada)
+            # (cópia: a serialização acontece depois, em outra thread)
+            "result": copy.deepcopy(result),
+            "usage": _usage_to_dict(response),
+            "latency_ms": round(latency_ms, 3),
+        }
+        self._writer.write(entry)
+
+    def shutdown(self) -> None:
+        """Grava as chamadas pendentes."""
+        self._writer.shutdown()
+
+
+def load_recordings(path: str) -> list[dict[str, Any]]:
+    """Carrega gravações de um arquivo .jsonl ou de todos os .jsonl de um diretório."""
+    files = sorted(glob.glob(os.path.join(path, "*.jsonl"))) if os.path.isdir(path) else [path]
+    recordings = []
+    for filename in files:
+        with open(filename, encoding="utf-8") as f:
+            recordings.extend(json.loads(line) for line in f if line.strip())
+    return recordings
+
+
+model_recorder = ModelRecorder(settings.MODEL_RECORDING_DIR) if settings.MODEL_RECORDING_DIR else None
@@ -0,0 +1,229 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from app.core.config import settings
+
+# Palavras que identificam um cabeçalho de licença no topo do arquivo
+_LICENSE_MARKERS = ("license", "licence", "licença", "copyright", "spdx-license-identifier", "(c)")
+
+# Comentários de linha inteira (Python, shell, JS/TS, Java, Go...)
+_LINE_COMMENT_PREFIXES = ("#", "//")
+
+# Comentários que carregam semântica e nunca devem ser removidos
+_KEEP_COMMENT_PREFIXES = ("#!", "# -*-", "# type:", "# noqa", "# pragma")
+
+# Linhas com "#" que não são comentários: diretivas do pré-processador C/C++
+# (#include, #define...) e atributos do Rust (#[derive], #![allow])
+_DIRECTIVE_RE = re.compile(
+    r"^#\s*(?:include|define|undef|if|ifdef|ifndef|else|elif|endif|pragma|import|error|warning|line)\b"
+    r"|^#!?\["
+)
+
+_STRING_LITERAL_RE = re.compile(r"""(?P<q>["'])(?P<body>(?:\\.|(?!(?P=q)).)*)(?P=q)""")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens (~4 caracteres por token), suficiente para o orçamento."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+@dataclass
+class CompactedCode:
+    """Código compactado para o prompt, com o mapeamento de volta às linhas originais."""
+
+    text: str
+    # line_map[i] = número (1-based) da linha original correspondente à linha i+1 do texto compactado
+    line_map: list[int] = field(default_factory=list)
+    original_tokens: int = 0
+    tokens: int = 0
+    stages: list[str] = field(default_factory=list)
+    # True quando linhas foram removidas e cada linha do texto começa com "<número original> | "
+    numbered: bool = False
+
+
+Lines = list[tuple[int, str]]
+
+
+def _render(lines: Lines) -> str:
+    return "\n".join(text for _, text in lines)
+
+
+def _render_numbered(lines: Lines) -> str:
+    # Com linhas removidas, cada linha leva o seu número no código original:
+    # o modelo cita esses números e as issues não precisam ser remapeadas
+    width = len(str(lines[-1][0])) if lines else 1
+    return "\n".join(f"{number:>{width}} | {text}" for number, text in lines)
+
+
+def _strip_trailing_whitespace(lines: Lines) -> Lines:
+    return [(number, text.rstrip()) for number, text in lines]
+
+
+def _collapse_blank_runs(lines: Lines) -> Lines:
+    """Remove espaços à direita e reduz sequências de linhas vazias a uma só."""
+    result: Lines = []
+    for number, text in lines:
+        text = text.rstrip()
+        if not text and (not result or not result[-1][1]):
+            continue
+        result.append((number, text))
+    while result and not result[-1][1]:
+        result.pop()
+    return result
+
+
+def _is_line_comment(text: str) -> bool:
+    stripped = text.lstrip()
+    return (
+        stripped.startswith(_LINE_COMMENT_PREFIXES)
+        and not stripped.startswith(_KEEP_COMMENT_PREFIXES)
+        and not _DIRECTIVE_RE.match(stripped)
+    )
+
+
+def _strip_license_header(lines: Lines) -> Lines:
+    """Remove o bloco de comentários inicial quando ele é um cabeçalho de licença."""
+    start = 0
+    while start < len(lines) and lines[start][1].lstrip().startswith(_KEEP_COMMENT_PREFIXES):
+        start += 1
+
+    end = start
+    if end < len(lines) and lines[end][1].lstrip().startswith("/*"):
+        while end < len(lines) and "*/" not in lines[end][1]:
+            end += 1
+        end += 1
+    else:
+        while end < len(lines) and (_is_line_comment(lines[end][1]) or not lines[end][1]):
+            end += 1
+
+    header = " ".join(text for _, text in lines[start:end]).lower()
+    if end > start and any(marker in header for marker in _LICENSE_MARKERS):
+        return lines[:start] + lines[end:]
+    return lines
+
+
+def _strip_line_comments(lines: Lines) -> Lines:
+    return [(number, text) for number, text in lines if not _is_line_comment(text)]
+
+
+def _shorten_string_literals(lines: Lines, max_chars: int) -> Lines:
+    """Encurta literais de string muito longos, inclusive blocos com aspas triplas."""
+
+    def _shorten(match: re.Match) -> str:
+        body = match.group("body")
+        if len(body) <= max_chars:
+            return match.group(0)
+        quote = match.group("q")
+        return f"{quote}{body[:max_chars]}…{quote}"
+
+    result: Lines = []
+    in_block = False
+    block_lines = 0
+    for number, text in lines:
+        delimiters = text.count('"""') + text.count("'''")
+        if in_block:
+            block_lines += 1
+            if delimiters % 2 == 1:
+                in_block = False
+                result.append((number, text))
+            elif block_lines <= 3:
+                result.append((number, text[: max_chars + 1]))
+            elif block_lines == 4:
+                result.append((number, "…"))
+            continue
+        if delimiters % 2 == 1:
+            in_block = True
+            block_lines = 0
+            result.append((number, text))
+            continue
+        result.append((number, _STRING_LITERAL_RE.sub(_shorten, text)))
+    return result
+
+
+def _truncate_to_budget(lines: Lines, budget: int) -> Lines:
+    """Corta o final do código quando nada mais cabe no orçamento."""
+    result: Lines = []
+    used = 0
+    for index, (number, text) in enumerate(lines):
+        # Conta o prefixo com o número da linha: o texto cortado sempre sai numerado
+        cost = estimate_tokens(f"{number} | {text}") + 1
+        if used + cost > budget:
+            omitted = len(lines) - index
+            result.append((number, f"# ... [{omitted} linhas omitidas por limite de tamanho]"))
+            break
+        result.append((number, text))
+        used += cost
+    return result
+
+
+def compact_code(code: str, budget: int | None = None) -> CompactedCode:
+    """
+    Compacta o código antes de enviá-lo ao modelo para análise.
+
+    É uma compactação com perdas: use apenas quando a saída do modelo é uma
+    análise, nunca quando o modelo deve devolver o próprio código reescrito.
+
+    Só os espaços à direita são sempre removidos, o que preserva a numeração
+    das linhas. As demais etapas (linhas vazias repetidas, cabeçalho de
+    licença, comentários, strings longas e, por fim, corte) só rodam enquanto
+    o código estiver acima do orçamento de tokens; quando alguma linha é
+    removida, o texto passa a trazer o número da linha original em cada linha.
+    """
+    budget = budget if budget is not None else settings.PROMPT_TOKEN_BUDGET
+    original_tokens = estimate_tokens(code)
+
+    lines: Lines = _strip_trailing_whitespace(list(enumerate(code.splitlines(), start=1)))
+    stages = ["whitespace"]
+
+    reducers = [
+        ("collapse_blank_runs", _collapse_blank_runs),
+        ("license_header", _strip_license_header),
+        ("line_comments", _strip_line_comments),
+        ("string_literals", lambda ls: _shorten_string_literals(ls, settings.PROMPT_MAX_STRING_CHARS)),
+        ("truncate", lambda ls: _truncate_to_budget(ls, budget)),
+    ]
+    for name, reducer in reducers:
+        if estimate_tokens(_render(lines)) <= budget:
+            break
+        lines = reducer(lines)
+        stages.append(name)
+
+    line_map = [number for number, _ in lines]
+    numbered = line_map != list(range(1, len(line_map) + 1))
+    text = _render_numbered(lines) if numbered else _render(lines)
+    return CompactedCode(
+        text=text,
+        line_map=line_map,
+        numbered=numbered,
+        original_tokens=original_tokens,
+        tokens=estimate_tokens(text),
+        stages=stages,
+    )
+
+
+def format_issue_list(issues: Iterable[str]) -> str:
+    """Formata a lista de issues para o prompt de correção."""
+    issues = [issue for issue in issues if isinstance(issue, str) and issue.strip()]
+    if not issues:
+        return "Nenhum problema específico listado."
+    return "\n".join(f"- {issue.strip()}" for issue in issues)
+
+
+def log_usage(label: str, response, compacted: CompactedCode | None = None) -> None:
+    """Registra o usage_metadata do Gemini para acompanhar a economia de tokens."""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    cached_tokens = getattr(usage, "cached_content_token_count", None)
+    message = (
+        f"[USAGE] {label}: prompt={prompt_tokens} cached={cached_tokens} "
+        f"output={output_tokens}"
+    )
+    if compacted is not None:
+        message += (
+            f" code_estimate={compacted.original_tokens}->{compacted.tokens}"
+            f" stages={','.join(compacted.stages)}"
+        )
+    print(message)
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.core.config import settings
+
+
+_GENERATION_KEY = "report_cache:generation"
+# Canal em que cada invalidação é publicada para os LRUs locais dos outros workers
+_INVALIDATION_CHANNEL = "report_cache:invalidations"
+
+# Grava o relatório só se nenhuma invalidação aconteceu desde que a leitura no
+# banco começou (geração inalterada); check-and-set atômico no Redis.
+_GUARDED_SET_LUA = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('SADD', KEYS[3], ARGV[4])
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+return 1
+"""
+
+
+@dataclass
+class CacheGeneration:
+    """Gerações de invalidação lidas antes de consultar o banco."""
+
+    local: int
+    remote: int | None
+
+
+@dataclass
+class CachedReport:
+    etag: str
+    body: bytes
+    repository_id: UUID
+    expires_at: float
+
+
+class ReportCache:
+    """
+    Cache de leitura dos payloads serializados de ReportDetail.
+
+    Relatórios são imutáveis depois de gravados, então o único dado que pode
+    mudar é o nome do repositório: a invalidação é feita por repositório (em
+    rename ou delete). O nível local é um LRU por processo; o nível Redis
+    (opcional, via REDIS_URL) é compartilhado e invalidado explicitamente.
+
+    Com Redis, cada invalidação também é publicada em um canal pub/sub que
+    todos os workers escutam (start()), e o LRU local só é usado enquanto a
+    inscrição está ativa: se ela cai, o worker esvazia o LRU e lê do Redis até
+    se inscrever de novo. Sem Redis, a invalidação só alcança o worker que
+    atendeu o rename/delete e os demais podem servir o nome antigo por até
+    REPORT_CACHE_LOCAL_TTL_SECONDS.
+
+    Para evitar que uma leitura anterior a um rename grave o nome antigo depois
+    da invalidação, cada invalidação incrementa uma geração (local e no Redis).
+    Quem lê do banco pega a geração antes (generation()) e a repassa a set(),
+    que descarta a gravação se a geração mudou nesse meio tempo.
+    """
+
+    def __init__(self, max_size: int, local_ttl: float, redis_url: str | None, redis_ttl: int):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_url = redis_url
+        self.redis_ttl = redis_ttl
+        self._entries: OrderedDict[UUID, CachedReport] = OrderedDict()
+        self._by_repository: dict[UUID, set[UUID]] = {}
+        self._redis = None
+        self._guarded_set = None
+        self._generation = 0
+        self._listener: asyncio.Task | None = None
+        self._subscribed = False
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                print("[DEBUG] REDIS_URL definido, mas o pacote redis não está instalado")
+                self.redis_url = None
+                return None
+            self._redis = redis.from_url(self.redis_url)
+            self._guarded_set = self._redis.register_script(_GUARDED_SET_LUA)
+        return self._redis
+
+    async def start(self) -> None:
+        """Começa a escutar as invalidações publicadas pelos outros workers."""
+        if self._listener is None and self._get_redis() is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(_INVALIDATION_CHANNEL)
+                self._subscribed = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._invalidate_local(UUID(message["data"].decode()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[DEBUG] Inscrição de invalidações do cache perdida: {e}")
+            finally:
+                # Invalidações podem ter sido perdidas: o LRU local deixa de valer
+                self._subscribed = False
+                self._generation += 1
+                self._entries.clear()
+                self._by_repository.clear()
+                await pubsub.reset()
+            await asyncio.sleep(1)
+
+    def _local_enabled(self) -> bool:
+        return self.redis_url is None or self._subscribed
+
+    def _invalidate_local(self, repository_id: UUID) -> None:
+        self._generation += 1
+        for report_id in list(self._by_repository.get(repository_id, ())):
+            self._drop_local(report_id)
+
+    def _store_local(self, report_id: UUID, entry: CachedReport) -> None:
+        self._entries[report_id] = entry
+        self._entries.move_to_end(report_id)
+        self._by_repository.setdefault(entry.repository_id, set()).add(report_id)
+        while len(self._entries) > self.max_size:
+            self._drop_local(next(iter(self._entries)))
+
+    def _drop_local(self, report_id: UUID) -> None:
+        entry = self._entries.pop(report_id, None)
+        if entry is None:
+            return
+        siblings = self._by_repository.get(entry.repository_id)
+        if siblings is not None:
+            siblings.discard(report_id)
+            if not siblings:
+                del self._by_repository[entry.repository_id]
+
+    async def get(self, report_id: UUID) -> CachedReport | None:
+        entry = self._entries.get(report_id) if self._local_enabled() else None
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(report_id)
+                return entry
+            self._drop_local(report_id)
+
+        client = self._get_redis()
+        if client is None:
+            return None
+        local_generation = self._generation
+        try:
+            raw = await client.get(f"report:{report_id}")
+        except Exception as e:
+            print(f"[DEBUG] Falha ao ler cache Redis: {e}")
+            return None
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        entry = CachedReport(
+            etag=data["etag"],
+            body=data["body"].encode("utf-8"),
+            repository_id=UUID(data["repository_id"]),
+            expires_at=time.monotonic() + self.local_ttl,
+        )
+        # Uma invalidação recebida durante a leitura pode ter apagado esta chave
+        if local_generation == self._generation and self._local_enabled():
+            self._store_local(report_id, entry)
+        return entry
+
+    async def generation(self) -> CacheGeneration:
+        """Lê as gerações de invalidação; deve ser chamada antes da consulta ao banco."""
+        remote = None
+        client = self._get_redis()
+        if client is not None:
+            try:
+                remote = int(await client.get(_GENERATION_KEY) or 0)
+            except Exception as e:
+                print(f"[DEBUG] Falha ao ler geração do cache Redis: {e}")
+        return CacheGeneration(local=self._generation, remote=remote)
+
+    async def set(
+        self,
+        report_id: UUID,
+        repository_id: UUID,
+        body: bytes,
+        generation: CacheGeneration,
+    ) -> CachedReport:
+        entry = CachedReport(
+            etag=self.make_etag(body),
+            body=body,
+            repository_id=repository_id,
+            expires_at=time.monotonic() + self.local_ttl,
+        )
+        stored_remote = None
+        client = self._get_redis()
+        if client is not None:
+            stored_remote = False
+            if generation.remote is not None:
+                payload = json.dumps(
+                    {
+                        "etag": entry.etag,
+                        "body": body.decode("utf-8"),
+                        "repository_id": str(repository_id),
+                    }
+                )
+                try:
+                    stored_remote = bool(await self._guarded_set(
+                        keys=[
+                            _GENERATION_KEY,
+                            f"report:{report_id}",
+                            f"repository_reports:{repository_id}",
+                        ],
+                        args=[str(generation.remote), payload, self.redis_ttl, str(report_id)],
+                    ))
+                except Exception as e:
+                    print(f"[DEBUG] Falha ao gravar cache Redis: {e}")
+
+        # Houve invalidação durante a leitura (neste worker ou em outro): o
+        # payload pode estar desatualizado e não vai para o LRU local
+        if generation.local == self._generation and stored_remote is not False and self._local_enabled():
+            self._store_local(report_id, entry)
+        return entry
+
+    async def invalidate_repository(self, repository_id: UUID) -> None:
+        """Remove do cache todos os relatórios de um repositório (rename/delete)."""
+        self._invalidate_local(repository_id)
+
+        client = self._get_redis()
+        if client is None:
+            return
+        index_key = f"repository_reports:{repository_id}"
+        try:
+            # Incrementa a geração antes de apagar: leituras em andamento não regravam
+            await client.incr(_GENERATION_KEY)
+            report_ids = await client.smembers(index_key)
+            keys = [f"report:{report_id.decode()}" for report_id in report_ids]
+            await client.delete(index_key, *keys)
+            await client.publish(_INVALIDATION_CHANNEL, str(repository_id))
+        except Exception as e:
+            print(f"[DEBUG] Falha ao invalidar cache Redis: {e}")
+
+
+report_cache = ReportCache(
+    max_size=settings.REPORT_CACHE_SIZE,
+    local_ttl=settings.REPORT_CACHE_LOCAL_TTL_SECONDS,
+    redis_url=settings.REDIS_URL,
+    redis_ttl=settings.REPORT_CACHE_REDIS_TTL_SECONDS,
+)
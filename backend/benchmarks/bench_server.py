@@ -0,0 +1,123 @@
+"""
+Benchmark de carga para comparar perfis do servidor (dev --reload vs produção).
+
+Os dois perfis usam o mesmo serviço e a mesma porta (8000), então são medidos
+um depois do outro: o resultado do primeiro é salvo com --save e usado como
+linha de base na segunda execução com --baseline.
+
+    # 1. perfil dev: docker-compose up -d
+    python benchmarks/bench_server.py --target dev=http://localhost:8000 \
+        --path /api/v1/users/?limit=20 --concurrency 64 --requests 2000 --save dev.json
+
+    # 2. perfil de produção:
+    #    docker-compose -f docker-compose.yml -f docker-compose.prod.yml up -d --build backend
+    python benchmarks/bench_server.py --target prod=http://localhost:8000 \
+        --path /api/v1/users/?limit=20 --concurrency 64 --requests 2000 --baseline dev.json
+
+Para medir o limite de chamadas ao modelo, use --method POST --path
+/api/v1/analysis/analyze --body payload.json: respostas 503 indicam carga
+descartada pelo limitador e aparecem separadas na saída.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def run_target(
+    base_url: str,
+    method: str,
+    path: str,
+    body: dict | None,
+    concurrency: int,
+    total: int,
+) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    return {
+        "requests": total,
+        "elapsed_s": round(elapsed, 2),
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(0.50), 1),
+        "p95_ms": round(percentile(0.95), 1),
+        "p99_ms": round(percentile(0.99), 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "statuses": dict(statuses),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, help="nome=url_base (repetível)")
+    parser.add_argument("--path", default="/api/v1/users/?limit=20")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="arquivo JSON enviado como corpo da requisição")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--save", help="grava os resultados desta execução em JSON")
+    parser.add_argument("--baseline", help="JSON salvo com --save para comparar com esta execução")
+    args = parser.parse_args()
+
+    body = None
+    if args.body:
+        with open(args.body, encoding="utf-8") as f:
+            body = json.load(f)
+
+    results = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results.update(json.load(f))
+
+    measured = {}
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        print(f"Executando {name} ({base_url}{args.path})...")
+        measured[name] = await run_target(
+            base_url, args.method.upper(), args.path, body, args.concurrency, args.requests
+        )
+    results.update(measured)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(measured, f, indent=2)
+
+    columns = ["rps", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "elapsed_s"]
+    print()
+    print(f"{'perfil':<12}" + "".join(f"{column:>12}" for column in columns) + "  status")
+    for name, result in results.items():
+        row = "".join(f"{result[column]:>12}" for column in columns)
+        print(f"{name:<12}{row}  {result['statuses']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
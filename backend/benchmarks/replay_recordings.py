@@ -0,0 +1,116 @@
+"""
+Replay offline das chamadas ao modelo gravadas em produção (MODEL_RECORDING_DIR).
+
+Cada gravação é reexecutada pelo pipeline atual (compactação do prompt,
+limitador, chamada, parsing) contra o modelo falso, que responde com a
+resposta gravada. A saída mostra o tempo por estágio (spans) e aponta
+regressões: prompts que não batem mais com a gravação ("miss") indicam
+mudança no prompt gerado, e resultados diferentes do resultado gravado (o que
+analyze_code/generate_fix devolveram em produção) indicam mudança no parsing.
+Como analyze_code devolve um resultado de erro em vez de levantar exceção,
+esses resultados também contam como falha.
+
+Gravações feitas antes de o resultado ser gravado só são verificadas quanto a
+misses e erros. Gravações feitas com o formato antigo do prompt (linhas vazias
+sempre colapsadas, código do fix compactado) aparecem como miss.
+
+    python benchmarks/replay_recordings.py recordings/ --repeat 3
+    python benchmarks/replay_recordings.py recordings/ --simulate-latency
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] if values else 0.0
+
+
+def compare(kind: str, result, expected) -> str | None:
+    """Devolve a diferença entre o resultado reexecutado e o gravado, ou None se batem."""
+    if kind == "analyze" and isinstance(result, dict) and result.get("error"):
+        return f"resultado de erro: {result.get('summary')}"
+    if result == expected:
+        return None
+    if kind != "analyze":
+        return "código corrigido diferente do gravado"
+    if not isinstance(result, dict) or not isinstance(expected, dict):
+        return f"resultado {type(result).__name__} != gravado {type(expected).__name__}"
+    for field in sorted(set(result) | set(expected)):
+        if result.get(field) != expected.get(field):
+            return f"{field}: {result.get(field)!r} != {expected.get(field)!r}"
+    return None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", help="arquivo .jsonl ou diretório com as gravações")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--simulate-latency", action="store_true", help="reproduz a latência de rede gravada")
+    args = parser.parse_args()
+
+    # Precisa valer antes de importar a aplicação (settings é lido na importação)
+    os.environ["FAKE_MODEL_RECORDINGS"] = args.recordings
+    os.environ["MODEL_RECORDING_DIR"] = ""
+
+    from app.core.tracing import InMemorySpanExporter, add_exporter
+    from app.services import ai_analyzer
+    from app.services.fake_model import FakeGenerativeModel
+    from app.services.model_recorder import load_recordings
+
+    recordings = load_recordings(args.recordings)
+    for instruction in (ai_analyzer.SYSTEM_INSTRUCTION, ai_analyzer.FIX_INSTRUCTION):
+        model = FakeGenerativeModel(instruction, recordings, simulate_latency=args.simulate_latency)
+        ai_analyzer._models[instruction] = model
+
+    exporter = InMemorySpanExporter()
+    add_exporter(exporter)
+
+    failures = 0
+    unchecked = sum(1 for recording in recordings if "result" not in recording) * args.repeat
+    for _ in range(args.repeat):
+        for recording in recordings:
+            inputs = recording.get("inputs", {})
+            try:
+                if recording["kind"] == "analyze":
+                    result = await ai_analyzer.analyze_code(inputs["code"])
+                else:
+                    result = await ai_analyzer.generate_fix(inputs["code"], inputs.get("issues", []))
+                # Gravações sem resultado só são verificadas quanto a erros
+                problem = compare(recording["kind"], result, recording.get("result", result))
+            except Exception as e:
+                problem = f"{type(e).__name__}: {e}"
+            if problem:
+                failures += 1
+                print(f"[{recording['kind']}] {recording['key'][:12]}: {problem}")
+
+    durations: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for span in exporter.spans:
+        durations[span.name].append(span.duration_ms)
+        if span.status == "ERROR":
+            errors[span.name] += 1
+
+    recorded_latency = [recording.get("latency_ms", 0.0) for recording in recordings]
+    print(f"\nGravações: {len(recordings)} x {args.repeat} | falhas: {failures} | "
+          f"misses de prompt: {errors.get('ai.model_call', 0)} | sem resultado gravado: {unchecked}")
+    if recorded_latency:
+        print(f"Latência gravada do modelo: p50={percentile(recorded_latency, 0.5):.1f}ms "
+              f"p95={percentile(recorded_latency, 0.95):.1f}ms")
+
+    print(f"\n{'estágio':<20}{'n':>6}{'p50_ms':>10}{'p95_ms':>10}{'mean_ms':>10}{'erros':>8}")
+    for name, values in sorted(durations.items()):
+        print(
+            f"{name:<20}{len(values):>6}{percentile(values, 0.5):>10.3f}"
+            f"{percentile(values, 0.95):>10.3f}{statistics.fmean(values):>10.3f}{errors.get(name, 0):>8}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Popula o catálogo de issues a partir dos relatórios já gravados.
+
+Relatórios criados antes do catálogo só têm as issues em full_report["issues"].
+Este script roda record_issues para cada relatório que ainda não tem ligações
+em report_issue, em lotes com um commit por lote. Pode ser executado de novo
+com segurança: relatórios já ligados são ignorados.
+
+    docker-compose exec backend python scripts/backfill_issue_catalog.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import exists, select
+
+from app.db.session import AsyncSessionLocal
+from app.models import AnalysisReport, ReportIssue
+from app.services.issue_catalog import record_issues
+
+
+def _is_model_failure(summary: str | None, full_report) -> bool:
+    # Resultados de falha do modelo não são análises reais (inclui os gravados
+    # antes da flag "error", identificados pelo resumo)
+    if isinstance(full_report, dict) and full_report.get("error"):
+        return True
+    return bool(summary) and summary.startswith("Erro de Modelo:")
+
+
+async def backfill(batch_size: int) -> None:
+    processed = 0
+    linked = 0
+    last_id = None
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            # Só as colunas necessárias: code_content não é carregado
+            stmt = (
+                select(
+                    AnalysisReport.id,
+                    AnalysisReport.repository_id,
+                    AnalysisReport.summary,
+                    AnalysisReport.full_report,
+                    AnalysisReport.created_at,
+                )
+                .where(~exists().where(ReportIssue.report_id == AnalysisReport.id))
+                .order_by(AnalysisReport.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(AnalysisReport.id > last_id)
+
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+
+            for report_id, repository_id, summary, full_report, created_at in rows:
+                processed += 1
+                if not isinstance(full_report, dict) or _is_model_failure(summary, full_report):
+                    continue
+                issues = full_report.get("issues")
+                if not isinstance(issues, list) or not issues:
+                    continue
+                categories = full_report.get("categories")
+                await record_issues(
+                    db,
+                    repository_id,
+                    report_id,
+                    issues,
+                    categories if isinstance(categories, list) else None,
+                    seen_at=created_at,
+                )
+                linked += 1
+
+            await db.commit()
+            last_id = rows[-1][0]
+            print(f"Relatórios processados: {processed} | com issues catalogadas: {linked}")
+
+    print(f"Backfill concluído: {processed} relatórios processados, {linked} ligados ao catálogo")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()